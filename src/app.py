@@ -1,14 +1,29 @@
 """FastAPI application for product recommendations."""
+import asyncio
 import os
+from concurrent.futures import ThreadPoolExecutor
+import orjson
+import pandas as pd
 from fastapi import FastAPI, HTTPException, Query
+from fastapi.responses import JSONResponse
 from typing import Optional
 from src.model import Recommender
-from src.utils import encode_cursor, decode_cursor
+from src.ranking import warm_up
+from src.utils import CURSOR_MAX_VALUE, encode_cursor, decode_cursor
 
-# Set deterministic hash seed
-os.environ['PYTHONHASHSEED'] = '0'
 
-app = FastAPI(title="SHL Recommendation Engine")
+class ORJSONResponse(JSONResponse):
+    """JSON response rendered with orjson (handles NumPy values natively)."""
+    
+    def render(self, content) -> bytes:
+        """Serialize content to JSON bytes."""
+        return orjson.dumps(content, option=orjson.OPT_SERIALIZE_NUMPY)
+
+
+app = FastAPI(
+    title="SHL Recommendation Engine",
+    default_response_class=ORJSONResponse
+)
 
 # Load recommender model
 try:
@@ -16,53 +31,40 @@ try:
 except Exception as e:
     raise RuntimeError(f"Failed to load model: {e}")
 
+# Compile the ranking kernels before the first request
+warm_up()
 
-@app.get("/recommend")
-async def recommend(
-    product_id: str = Query(..., description="Product ID to get recommendations for"),
-    k: int = Query(10, ge=1, le=100, description="Number of recommendations"),
-    alpha: float = Query(0.6, ge=0.0, le=1.0, description="Content similarity weight"),
-    cursor: Optional[str] = Query(None, description="Pagination cursor"),
-    diversify: bool = Query(False, description="Whether to diversify results")
-):
-    """Get product recommendations.
+# Bounded pool for CPU-bound scoring so it never runs on the event loop.
+# Handlers return its payloads as ORJSONResponse directly, skipping
+# FastAPI's jsonable_encoder pass (payloads hold only plain Python values)
+cpu_pool = ThreadPoolExecutor(max_workers=os.cpu_count())
+
+
+def _do_recommend(
+    product_id: str,
+    k: int,
+    alpha: float,
+    offset: int,
+    seed: int,
+    diversify: bool
+) -> dict:
+    """Build the /recommend response for a known product.
     
     Args:
         product_id: Product ID to get recommendations for
         k: Number of recommendations to return
         alpha: Weight for content similarity (0-1)
-        cursor: Pagination cursor from previous response
+        offset: Offset for pagination
+        seed: Random seed for tie-breaking
         diversify: Whether to diversify results (not implemented)
-        
+    
     Returns:
-        JSON response with recommendations
+        Response payload
     """
-    # Decode cursor if provided
-    offset = 0
-    seed = 0
-    if cursor:
-        try:
-            decoded_product_id, decoded_offset, decoded_seed = decode_cursor(cursor)
-            # Validate cursor matches current request
-            if decoded_product_id != product_id:
-                raise ValueError("Cursor product_id mismatch")
-            offset = decoded_offset
-            seed = decoded_seed
-        except Exception:
-            raise HTTPException(status_code=400, detail="Invalid cursor")
-    
-    # Check if product exists
-    if product_id not in recommender.catalog_df['product_id'].values:
-        from fastapi.responses import JSONResponse
-        return JSONResponse(
-            status_code=404,
-            content={"error": "product_id not found"}
-        )
-    
     # Get product name
-    product_row = recommender.catalog_df[
-        recommender.catalog_df['product_id'] == product_id
-    ].iloc[0]
+    product_row = recommender.catalog_df.iloc[
+        recommender.product_id_to_idx[product_id]
+    ]
     product_name = product_row['product_name']
     
     # Get recommendations
@@ -87,44 +89,29 @@ async def recommend(
         "page_size": k,
         "offset": offset,
         "total_available": total_available,
-        "items": recommendations,
+        "items": recommendations.to_dicts(),
         "next_cursor": next_cursor
     }
 
 
-@app.get("/search")
-async def search(
-    query: str = Query(..., description="Text query to search for products"),
-    k: int = Query(10, ge=1, le=100, description="Number of results to return")
-):
-    """Search for products by text query and return matching products.
+def _do_search(query: str, k: int) -> dict:
+    """Build the /search response.
     
     Args:
-        query: Text query to search for (searches in product name, description, brand, category)
+        query: Text query to search for
         k: Number of results to return
-        
+    
     Returns:
-        JSON response with matching products
+        Response payload
     """
-    import pandas as pd
-    import numpy as np
-    
     # Search in product name, description, brand, and category
     catalog_df = recommender.catalog_df
     
-    # Create search text by combining relevant fields
-    search_text = (
-        catalog_df['product_name'].fillna('').str.lower() + ' ' +
-        catalog_df['description'].fillna('').str.lower() + ' ' +
-        catalog_df['brand'].fillna('').str.lower() + ' ' +
-        catalog_df['category'].fillna('').str.lower()
-    )
-    
-    # Simple text matching (case-insensitive)
-    query_lower = query.lower()
-    matches = search_text.str.contains(query_lower, na=False, regex=False)
+    # Simple text matching (case-insensitive) over the precomputed corpus
+    matched_indices = recommender.search(query)
+    total_results = len(matched_indices)
     
-    if not matches.any():
+    if total_results == 0:
         return {
             "query": query,
             "total_results": 0,
@@ -132,7 +119,7 @@ async def search(
         }
     
     # Get matching products
-    matched_products = catalog_df[matches].head(k)
+    matched_products = catalog_df.iloc[matched_indices[:k]]
     
     # Build response
     items = []
@@ -148,40 +135,27 @@ async def search(
     
     return {
         "query": query,
-        "total_results": int(matches.sum()),
+        "total_results": total_results,
         "items": items
     }
 
 
-@app.get("/search-and-recommend")
-async def search_and_recommend(
-    query: str = Query(..., description="Text query to find a product"),
-    k: int = Query(10, ge=1, le=100, description="Number of recommendations"),
-    alpha: float = Query(0.6, ge=0.0, le=1.0, description="Content similarity weight")
-):
-    """Search for a product by text, then get recommendations for the first match.
+def _do_search_and_recommend(query: str, k: int, alpha: float) -> dict:
+    """Build the /search-and-recommend response.
     
     Args:
         query: Text query to find a product
         k: Number of recommendations to return
         alpha: Weight for content similarity (0-1)
-        
+    
     Returns:
-        JSON response with search results and recommendations
+        Response payload
     """
-    import pandas as pd
-    
     # First, search for the product
     catalog_df = recommender.catalog_df
-    search_text = (
-        catalog_df['product_name'].fillna('').str.lower() + ' ' +
-        catalog_df['description'].fillna('').str.lower()
-    )
-    
-    query_lower = query.lower()
-    matches = search_text.str.contains(query_lower, na=False, regex=False)
+    matched_indices = recommender.search(query, limit=1)
     
-    if not matches.any():
+    if len(matched_indices) == 0:
         return {
             "query": query,
             "matched_product": None,
@@ -190,7 +164,7 @@ async def search_and_recommend(
         }
     
     # Get the first matching product
-    matched_product = catalog_df[matches].iloc[0]
+    matched_product = catalog_df.iloc[matched_indices[0]]
     product_id = matched_product['product_id']
     
     # Get recommendations for this product
@@ -211,13 +185,106 @@ async def search_and_recommend(
             "brand": matched_product['brand'],
             "category": matched_product['category']
         },
-        "recommendations": recommendations,
+        "recommendations": recommendations.to_dicts(),
         "total_available": total_available
     }
 
 
+@app.get("/recommend")
+async def recommend(
+    product_id: str = Query(..., description="Product ID to get recommendations for"),
+    k: int = Query(10, ge=1, le=100, description="Number of recommendations"),
+    alpha: float = Query(0.6, ge=0.0, le=1.0, description="Content similarity weight"),
+    cursor: Optional[str] = Query(None, description="Pagination cursor"),
+    diversify: bool = Query(False, description="Whether to diversify results")
+):
+    """Get product recommendations.
+    
+    Args:
+        product_id: Product ID to get recommendations for
+        k: Number of recommendations to return
+        alpha: Weight for content similarity (0-1)
+        cursor: Pagination cursor from previous response
+        diversify: Whether to diversify results (not implemented)
+    
+    Returns:
+        JSON response with recommendations
+    """
+    # Decode cursor if provided
+    offset = 0
+    seed = 0
+    if cursor:
+        try:
+            decoded_product_id, decoded_offset, decoded_seed = decode_cursor(cursor)
+            # Validate cursor matches current request
+            if decoded_product_id != product_id:
+                raise ValueError("Cursor product_id mismatch")
+            offset = decoded_offset
+            seed = decoded_seed
+        except Exception:
+            raise HTTPException(status_code=400, detail="Invalid cursor")
+        
+        # The next cursor has to fit the same unsigned 32-bit fields
+        if offset + k > CURSOR_MAX_VALUE or seed > CURSOR_MAX_VALUE:
+            raise HTTPException(status_code=400, detail="Cursor offset out of range")
+    
+    # Check if product exists
+    if product_id not in recommender.product_id_to_idx:
+        return ORJSONResponse(
+            status_code=404,
+            content={"error": "product_id not found"}
+        )
+    
+    loop = asyncio.get_running_loop()
+    payload = await loop.run_in_executor(
+        cpu_pool, _do_recommend, product_id, k, alpha, offset, seed, diversify
+    )
+    return ORJSONResponse(payload)
+
+
+@app.get("/search")
+async def search(
+    query: str = Query(..., description="Text query to search for products"),
+    k: int = Query(10, ge=1, le=100, description="Number of results to return")
+):
+    """Search for products by text query and return matching products.
+    
+    Args:
+        query: Text query to search for (searches in product name, description, brand, category)
+        k: Number of results to return
+    
+    Returns:
+        JSON response with matching products
+    """
+    loop = asyncio.get_running_loop()
+    payload = await loop.run_in_executor(cpu_pool, _do_search, query, k)
+    return ORJSONResponse(payload)
+
+
+@app.get("/search-and-recommend")
+async def search_and_recommend(
+    query: str = Query(..., description="Text query to find a product"),
+    k: int = Query(10, ge=1, le=100, description="Number of recommendations"),
+    alpha: float = Query(0.6, ge=0.0, le=1.0, description="Content similarity weight")
+):
+    """Search for a product by text, then get recommendations for the first match.
+    
+    Args:
+        query: Text query to find a product
+        k: Number of recommendations to return
+        alpha: Weight for content similarity (0-1)
+    
+    Returns:
+        JSON response with search results and recommendations
+    """
+    loop = asyncio.get_running_loop()
+    payload = await loop.run_in_executor(
+        cpu_pool, _do_search_and_recommend, query, k, alpha
+    )
+    return ORJSONResponse(payload)
+
+
 @app.get("/health")
 async def health():
     """Health check endpoint."""
     return {"status": "healthy"}
-
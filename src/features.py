@@ -1,14 +1,9 @@
 """Feature engineering and vectorization for products."""
-import os
 import numpy as np
 import pandas as pd
 from sklearn.feature_extraction.text import TfidfVectorizer
-from sklearn.preprocessing import OneHotEncoder
-from scipy.sparse import hstack
-
-# Set deterministic seeds
-os.environ['PYTHONHASHSEED'] = '0'
-np.random.seed(0)
+from sklearn.preprocessing import OneHotEncoder, normalize
+from scipy.sparse import csr_matrix, hstack
 
 
 class ProductVectorizer:
@@ -30,14 +25,14 @@ class ProductVectorizer:
         self.category_encoder = OneHotEncoder(sparse_output=True, handle_unknown='ignore')
         self.is_fitted = False
         
-    def fit_transform(self, catalog_df: pd.DataFrame) -> np.ndarray:
+    def fit_transform(self, catalog_df: pd.DataFrame) -> csr_matrix:
         """Fit vectorizers and transform catalog to vectors.
         
         Args:
             catalog_df: DataFrame with product_id, product_name, brand, category, description
             
         Returns:
-            Normalized product vectors as dense numpy array
+            Normalized product vectors as float32 CSR sparse matrix
         """
         # Combine text features
         text_features = (
@@ -57,25 +52,27 @@ class ProductVectorizer:
         )
         
         # Combine all features
-        combined = hstack([tfidf_features, brand_features, category_features])
+        combined = hstack(
+            [tfidf_features, brand_features, category_features],
+            format='csr',
+            dtype=np.float32
+        )
         
-        # Convert to dense and normalize to unit length
-        dense = combined.toarray()
-        norms = np.linalg.norm(dense, axis=1, keepdims=True)
-        norms[norms == 0] = 1  # Avoid division by zero
-        normalized = dense / norms
+        # Normalize rows to unit length, keeping the matrix sparse
+        # (all-zero rows are left as zeros)
+        normalized = normalize(combined, norm='l2', axis=1, copy=False)
         
         self.is_fitted = True
         return normalized
     
-    def transform(self, catalog_df: pd.DataFrame) -> np.ndarray:
+    def transform(self, catalog_df: pd.DataFrame) -> csr_matrix:
         """Transform new products to vectors.
         
         Args:
             catalog_df: DataFrame with product_id, product_name, brand, category, description
             
         Returns:
-            Normalized product vectors as dense numpy array
+            Normalized product vectors as float32 CSR sparse matrix
         """
         if not self.is_fitted:
             raise ValueError("Vectorizer must be fitted first")
@@ -98,13 +95,15 @@ class ProductVectorizer:
         )
         
         # Combine all features
-        combined = hstack([tfidf_features, brand_features, category_features])
+        combined = hstack(
+            [tfidf_features, brand_features, category_features],
+            format='csr',
+            dtype=np.float32
+        )
         
-        # Convert to dense and normalize to unit length
-        dense = combined.toarray()
-        norms = np.linalg.norm(dense, axis=1, keepdims=True)
-        norms[norms == 0] = 1  # Avoid division by zero
-        normalized = dense / norms
+        # Normalize rows to unit length, keeping the matrix sparse
+        # (all-zero rows are left as zeros)
+        normalized = normalize(combined, norm='l2', axis=1, copy=False)
         
         return normalized
 
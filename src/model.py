@@ -1,14 +1,165 @@
 """Recommender model with hybrid content-based and popularity-based approach."""
-import os
+import copy
+import functools
 import pickle
+import sys
+from collections.abc import Sequence
+from dataclasses import dataclass
+from enum import IntFlag
+from types import MappingProxyType
 import numpy as np
 import pandas as pd
+import zstandard as zstd
+from scipy import sparse
 from typing import List, Dict, Optional, Tuple
 from src.features import ProductVectorizer
+from src.ranking import (
+    blend_score, blend_top_k, blend_top_k_subset
+)
 
-# Set deterministic seeds
-os.environ['PYTHONHASHSEED'] = '0'
-np.random.seed(0)
+# Separates catalog rows in the search blob (never part of product text)
+SEARCH_SEPARATOR = '\x1f'
+
+# CSR arrays of the product vectors, each persisted as a memory-mappable .npy
+VECTOR_PARTS = ('data', 'indices', 'indptr')
+
+# Candidate-list arrays, persisted as memory-mappable .npy sidecars as well
+CANDIDATE_ARRAYS = ('candidate_indptr', 'candidate_ids', 'candidate_sims')
+
+# Compression level for the pickled bookkeeping state
+PICKLE_ZSTD_LEVEL = 3
+ZSTD_MAGIC = b'\x28\xb5\x2f\xfd'
+
+# Cached search matches: at most this many distinct lowercased queries, and
+# at most this many bytes (an entry can hold every catalog row)
+SEARCH_CACHE_SIZE = 2048
+SEARCH_CACHE_BYTES = 64 * 1024 * 1024
+
+# Cached similarity rows: at most this many, and at most this many bytes
+# (each row holds one float32 per product)
+SIMILARITY_CACHE_SIZE = 1024
+SIMILARITY_CACHE_BYTES = 64 * 1024 * 1024
+
+# Nearest content neighbors and most popular products precomputed as each
+# product's candidate list (upper bounds, see _candidate_count)
+NEIGHBOR_COUNT = 64
+POPULAR_CANDIDATE_COUNT = 64
+MIN_CANDIDATE_COUNT = 16
+
+# Memory budget for one block of candidate-list rows, and the bytes each row
+# needs per product: float32 similarities and their negated copy, int64
+# partition order and a bool list mask
+CANDIDATE_BLOCK_BYTES = 64 * 1024 * 1024
+CANDIDATE_ROW_BYTES = 4 + 4 + 8 + 1
+
+
+def _candidate_count(n_products: int, max_count: int) -> int:
+    """Number of candidates of one kind to keep for a catalog of n_products.
+    
+    A third of the catalog, between MIN_CANDIDATE_COUNT and max_count, so
+    the lists stay a fraction of small catalogs and bounded on large ones.
+    """
+    return min(max_count, max(MIN_CANDIDATE_COUNT, n_products // 3))
+
+
+class Reason(IntFlag):
+    """Explanation flags combined into one code per recommendation."""
+    STRONG_CONTENT = 1
+    MODERATE_TEXT = 2
+    SAME_BRAND = 4
+    SAME_CATEGORY = 8
+    POPULAR = 16
+    MODERATE_POPULARITY = 32
+    LOW_CONTENT = 64
+    POPULAR_FALLBACK = 128
+
+
+# Phrase for each flag, in the order they are joined
+_REASON_PHRASES = (
+    (Reason.STRONG_CONTENT, "strong content match"),
+    (Reason.MODERATE_TEXT, "moderate text similarity"),
+    (Reason.SAME_BRAND, "same brand"),
+    (Reason.SAME_CATEGORY, "same category"),
+    (Reason.POPULAR, "popular item"),
+    (Reason.MODERATE_POPULARITY, "moderate popularity"),
+    (Reason.LOW_CONTENT, "low content similarity"),
+    (Reason.POPULAR_FALLBACK, "popular fallback"),
+)
+
+
+def _reason_text(code: int) -> str:
+    """Join the phrases of the flags set in a reason code."""
+    phrases = [phrase for flag, phrase in _REASON_PHRASES if code & flag]
+    return sys.intern(" & ".join(phrases) if phrases else "general recommendation")
+
+
+# Interned reason string for every possible code, indexed by code
+REASON_TEXT = tuple(_reason_text(code) for code in range(256))
+
+
+@dataclass(frozen=True, slots=True, eq=False)
+class RecommendationBatch(Sequence):
+    """One page of recommendations stored as parallel arrays.
+    
+    Indexing returns a read-only mapping with product_id, score and reason
+    keys, built on access; to_dicts() materializes the whole page. Reasons
+    are kept as uint8 Reason codes and looked up in REASON_TEXT.
+    
+    Like the list of dicts it replaces, a batch compares equal to a list
+    with the same items, and adding a batch to a list (or to another batch)
+    gives a list of dicts.
+    """
+    product_ids: np.ndarray
+    scores: np.ndarray
+    reason_codes: np.ndarray
+    
+    @property
+    def reasons(self) -> List[str]:
+        """Reason strings of the page."""
+        return [REASON_TEXT[code] for code in self.reason_codes]
+    
+    def __len__(self) -> int:
+        return len(self.product_ids)
+    
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return RecommendationBatch(
+                self.product_ids[i], self.scores[i], self.reason_codes[i]
+            )
+        return MappingProxyType(self._item(i))
+    
+    def _item(self, i: int) -> Dict:
+        """Build the plain dict for one recommendation."""
+        return {
+            'product_id': self.product_ids[i],
+            'score': round(float(self.scores[i]), 3),
+            'reason': REASON_TEXT[self.reason_codes[i]]
+        }
+    
+    def to_dicts(self) -> List[Dict]:
+        """Return the page as a list of plain dicts (JSON-serializable)."""
+        return [self._item(i) for i in range(len(self.product_ids))]
+    
+    def __eq__(self, other):
+        if isinstance(other, RecommendationBatch):
+            return self.to_dicts() == other.to_dicts()
+        if isinstance(other, list):
+            return self.to_dicts() == other
+        return NotImplemented
+    
+    __hash__ = None
+    
+    def __add__(self, other):
+        if isinstance(other, RecommendationBatch):
+            return self.to_dicts() + other.to_dicts()
+        if isinstance(other, list):
+            return self.to_dicts() + other
+        return NotImplemented
+    
+    def __radd__(self, other):
+        if isinstance(other, list):
+            return other + self.to_dicts()
+        return NotImplemented
 
 
 class Recommender:
@@ -19,9 +170,50 @@ class Recommender:
         self.vectorizer = ProductVectorizer()
         self.product_vectors = None
         self.catalog_df = None
-        self.popularity_scores = None
+        self.popularity_arr = None
+        self.pid_rank = None
+        self.popular_order = None
+        self.brand_codes = None
+        self.category_codes = None
+        self.search_blob = ''
+        self.search_row_ends = None
         self.product_id_to_idx = {}
-        self.idx_to_product_id = {}
+        self.product_ids_arr = None
+        self.candidate_indptr = None
+        self.candidate_ids = None
+        self.candidate_sims = None
+        self.candidate_sim_floor = None
+        self.popularity_floor = 0.0
+        self._reset_caches()
+    
+    def __getstate__(self):
+        """Drop per-process caches when pickling."""
+        state = self.__dict__.copy()
+        state.pop('_search_matches', None)
+        state.pop('_similarity_row', None)
+        return state
+    
+    def __setstate__(self, state):
+        """Restore state and start with empty caches."""
+        self.__dict__.update(state)
+        self._reset_caches()
+    
+    def _reset_caches(self):
+        """Create empty query caches (called on init, fit and unpickling)."""
+        # Size both caches from the catalog so they stay within their byte
+        # budgets (0 disables a cache for very large catalogs): a search
+        # entry holds up to one int64 per product, a similarity row exactly
+        # one float32 per product
+        n_products = 0 if self.product_ids_arr is None else len(self.product_ids_arr)
+        matches_bytes = np.dtype(np.int64).itemsize * max(n_products, 1)
+        self._search_matches = functools.lru_cache(
+            maxsize=min(SEARCH_CACHE_SIZE, SEARCH_CACHE_BYTES // matches_bytes)
+        )(self._scan_search_blob)
+        
+        row_bytes = np.dtype(np.float32).itemsize * max(n_products, 1)
+        self._similarity_row = functools.lru_cache(
+            maxsize=min(SIMILARITY_CACHE_SIZE, SIMILARITY_CACHE_BYTES // row_bytes)
+        )(self._similarity_row_impl)
         
     def fit(self, catalog_df: pd.DataFrame, interactions_df: pd.DataFrame):
         """Fit the recommender on catalog and interactions.
@@ -32,117 +224,324 @@ class Recommender:
         """
         self.catalog_df = catalog_df.copy()
         
+        # Precompute lowercase search text (name, description, brand, category)
+        # joined into one blob, with the end offset of each row
+        search_rows = (
+            catalog_df['product_name'].fillna('') + ' ' +
+            catalog_df['description'].fillna('') + ' ' +
+            catalog_df['brand'].fillna('') + ' ' +
+            catalog_df['category'].fillna('')
+        ).str.lower().str.replace(SEARCH_SEPARATOR, ' ', regex=False).tolist()
+        self.search_blob = SEARCH_SEPARATOR.join(search_rows)
+        row_lengths = np.array([len(row) for row in search_rows], dtype=np.int64)
+        self.search_row_ends = np.cumsum(row_lengths + 1) - 1
+        
         # Create product vectors
         self.product_vectors = self.vectorizer.fit_transform(catalog_df)
         
-        # Build product ID mappings
-        for idx, product_id in enumerate(catalog_df['product_id']):
-            self.product_id_to_idx[product_id] = idx
-            self.idx_to_product_id[idx] = product_id
+        # Build product ID mappings (row index -> ID is a plain array lookup)
+        self.product_ids_arr = catalog_df['product_id'].to_numpy(dtype=object)
+        self.product_id_to_idx = {
+            product_id: idx for idx, product_id in enumerate(self.product_ids_arr)
+        }
+        
+        # Compute popularity scores (normalized interaction counts): weight
+        # each event, purchases more than views, and sum per product code
+        item_codes, items = pd.factorize(interactions_df['product_id'])
+        events = interactions_df['event'].to_numpy(dtype=object)
+        event_weights = np.select(
+            [events == 'purchase', events == 'view'], [2.0, 1.0], default=0.0
+        )
+        has_item = item_codes >= 0
+        total_scores = np.bincount(
+            item_codes[has_item],
+            weights=event_weights[has_item],
+            minlength=len(items)
+        )
         
-        # Compute popularity scores (normalized interaction counts)
-        purchase_counts = interactions_df[
-            interactions_df['event'] == 'purchase'
-        ]['product_id'].value_counts()
+        # Align with catalog row order; products without interactions get 0
+        catalog_codes = pd.Index(items).get_indexer(self.product_ids_arr)
+        popularity = np.where(
+            catalog_codes >= 0, total_scores[catalog_codes], 0.0
+        )
         
-        view_counts = interactions_df[
-            interactions_df['event'] == 'view'
-        ]['product_id'].value_counts()
+        # Normalize to 0-1 range
+        max_score = total_scores.max() if len(total_scores) else 0.0
+        if max_score > 0:
+            popularity = popularity / max_score
+        
+        # Popularity aligned with catalog row order for vectorized scoring
+        self.popularity_arr = popularity.astype(np.float32)
+        
+        # Lexicographic rank of each product_id, used as integer tie-break
+        self.pid_rank = np.argsort(
+            np.argsort(catalog_df['product_id'].to_numpy(), kind='stable'),
+            kind='stable'
+        ).astype(np.int32)
+        
+        # Catalog rows by popularity (descending, ties broken by product_id),
+        # so cold-start pages are plain slices
+        self.popular_order = np.lexsort(
+            (self.pid_rank, -self.popularity_arr)
+        ).astype(np.int32)
+        
+        # Integer brand/category codes for reason generation (-1 if missing)
+        self.brand_codes = pd.Categorical(catalog_df['brand']).codes.astype(np.int32)
+        self.category_codes = pd.Categorical(
+            catalog_df['category']
+        ).codes.astype(np.int32)
+        
+        # Per-product candidate lists, so most queries blend a few products
+        # instead of the whole catalog
+        self._build_candidate_lists()
+        
+        # Drop caches from a previous fit (sized for the new catalog)
+        self._reset_caches()
+    
+    def _build_candidate_lists(
+        self,
+        n_neighbors: Optional[int] = None,
+        n_popular: Optional[int] = None
+    ):
+        """Precompute each product's recommendation candidates.
+        
+        A product's list holds its n_neighbors most similar products plus the
+        n_popular most popular products, sorted by index in CSR layout. Any
+        product outside the list has similarity at most candidate_sim_floor and
+        popularity at most popularity_floor, which bounds its blended score.
+        
+        Similarities are computed a block of query rows at a time. A block
+        row needs about CANDIDATE_ROW_BYTES bytes per product (similarities,
+        their negated copy, the partition order and the list mask), and blocks
+        are sized so all of a block's working arrays fit in
+        CANDIDATE_BLOCK_BYTES.
+        
+        Args:
+            n_neighbors: Number of nearest content neighbors per product
+                (defaults to a third of the catalog, see _candidate_count)
+            n_popular: Number of most popular products in every list
+                (defaults to a third of the catalog, see _candidate_count)
+        """
+        n_products = self.product_vectors.shape[0]
+        if n_neighbors is None:
+            n_neighbors = _candidate_count(n_products, NEIGHBOR_COUNT)
+        if n_popular is None:
+            n_popular = _candidate_count(n_products, POPULAR_CANDIDATE_COUNT)
+        n_neighbors = min(n_neighbors, n_products - 1)
+        
+        # Most popular products, plus the best popularity left outside them
+        popular = self.popular_order[:n_popular]
+        self.popularity_floor = (
+            float(self.popularity_arr[self.popular_order[n_popular]])
+            if n_products > n_popular else 0.0
+        )
         
-        # Weight purchases more than views
-        total_scores = purchase_counts * 2.0 + view_counts * 1.0
+        row_bytes = CANDIDATE_ROW_BYTES * max(n_products, 1)
+        block_rows = max(1, CANDIDATE_BLOCK_BYTES // row_bytes)
+        vectors_t = self.product_vectors.T.tocsc()
+        
+        counts = np.zeros(n_products, dtype=np.int64)
+        candidate_ids = []
+        candidate_sims = []
+        self.candidate_sim_floor = np.zeros(n_products, dtype=np.float32)
+        for block_start in range(0, n_products, block_rows):
+            block_end = min(block_start + block_rows, n_products)
+            block_counts, block_ids, block_sims, block_floor = self._candidate_block(
+                block_start, block_end, vectors_t, n_neighbors, popular
+            )
+            counts[block_start:block_end] = block_counts
+            self.candidate_sim_floor[block_start:block_end] = block_floor
+            candidate_ids.append(block_ids)
+            candidate_sims.append(block_sims)
+        
+        indptr = np.zeros(n_products + 1, dtype=np.int64)
+        np.cumsum(counts, out=indptr[1:])
+        self.candidate_indptr = indptr
+        self.candidate_ids = np.concatenate(candidate_ids)
+        self.candidate_sims = np.concatenate(candidate_sims).astype(np.float32, copy=False)
+    
+    def _candidate_block(
+        self,
+        block_start: int,
+        block_end: int,
+        vectors_t: sparse.csc_matrix,
+        n_neighbors: int,
+        popular: np.ndarray
+    ) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+        """Build the candidate lists of one block of query rows.
         
-        # Normalize to 0-1 range
-        if total_scores.max() > 0:
-            self.popularity_scores = (total_scores / total_scores.max()).to_dict()
-        else:
-            self.popularity_scores = {}
+        The block's dense working arrays are freed when this returns, before
+        the next block is computed.
         
-        # Fill missing products with 0 popularity
-        for product_id in catalog_df['product_id']:
-            if product_id not in self.popularity_scores:
-                self.popularity_scores[product_id] = 0.0
+        Args:
+            block_start: First query row of the block
+            block_end: End (exclusive) of the block's query rows
+            vectors_t: Transposed product vectors
+            n_neighbors: Number of nearest content neighbors per product
+            popular: Indices of the most popular products
+            
+        Returns:
+            Tuple of (list lengths, concatenated candidate ids, their
+            similarities, similarity floor per row)
+        """
+        n_products = vectors_t.shape[1]
+        rows = np.arange(block_end - block_start)
+        queries = rows + block_start
+        
+        sims = (self.product_vectors[block_start:block_end] @ vectors_t).toarray()
+        floor = np.zeros(len(rows), dtype=np.float32)
+        
+        in_list = np.zeros(sims.shape, dtype=bool)
+        if n_neighbors < n_products - 1:
+            # Partition the negated similarities (query product last);
+            # position n_neighbors holds the best similarity left outside
+            # each list
+            negated = np.negative(sims)
+            negated[rows, queries] = np.inf
+            order = np.argpartition(negated, n_neighbors, axis=1)
+            in_list[rows[:, None], order[:, :n_neighbors]] = True
+            floor[:] = -negated[rows, order[:, n_neighbors]]
+        else:
+            in_list[:] = True
+        in_list[:, popular] = True
+        in_list[rows, queries] = False
+        
+        # Row-major nonzeros are already the block's CSR layout
+        list_rows, list_ids = np.nonzero(in_list)
+        return (
+            in_list.sum(axis=1),
+            list_ids.astype(np.int32),
+            sims[list_rows, list_ids],
+            floor
+        )
     
-    def _get_content_similarity(
-        self, 
-        query_idx: int, 
-        candidate_indices: List[int]
-    ) -> np.ndarray:
-        """Compute content similarity scores.
+    def _get_content_similarity(self, query_idx: int) -> np.ndarray:
+        """Compute content similarity of every product to the query product.
         
         Args:
             query_idx: Index of query product
-            candidate_indices: List of candidate product indices
             
         Returns:
-            Array of similarity scores
+            Array of similarity scores aligned with catalog rows
         """
-        if query_idx not in range(len(self.product_vectors)):
-            return np.zeros(len(candidate_indices))
+        n_products = self.product_vectors.shape[0]
+        if query_idx not in range(n_products):
+            return np.zeros(n_products, dtype=np.float32)
         
         query_vector = self.product_vectors[query_idx]
-        candidate_vectors = self.product_vectors[candidate_indices]
         
-        # Cosine similarity (vectors already normalized)
-        similarities = np.dot(candidate_vectors, query_vector)
+        # Cosine similarity (vectors already normalized); computed as a row
+        # product like the candidate-list blocks, so both give the same floats
+        similarities = (query_vector @ self.product_vectors.T).toarray().ravel()
         return similarities
     
-    def _get_popularity_scores(self, candidate_ids: List[str]) -> np.ndarray:
-        """Get popularity scores for candidate products.
+    def _similarity_row_impl(self, query_idx: int) -> np.ndarray:
+        """Compute the similarity row cached by ``_similarity_row``.
         
         Args:
-            candidate_ids: List of product IDs
+            query_idx: Index of query product
             
         Returns:
-            Array of popularity scores
+            Read-only float32 similarity of every product to the query
         """
-        return np.array([
-            self.popularity_scores.get(pid, 0.0) for pid in candidate_ids
-        ])
+        sims = self._get_content_similarity(query_idx).astype(np.float32, copy=False)
+        sims.flags.writeable = False
+        return sims
     
-    def _generate_reason(
-        self, 
-        content_sim: float, 
-        popularity: float,
-        query_product: pd.Series,
-        candidate_product: pd.Series
-    ) -> str:
-        """Generate explainable reason for recommendation.
+    def _blend_candidates(
+        self,
+        query_idx: int,
+        alpha: float,
+        k: int,
+        offset: int
+    ) -> Optional[Tuple[np.ndarray, np.ndarray, np.ndarray]]:
+        """Select one page from the query product's candidate list.
+        
+        The page is only returned when it provably matches a full catalog
+        scan: every product outside the list must score strictly below the
+        last score on the page.
         
         Args:
-            content_sim: Content similarity score
-            popularity: Popularity score
-            query_product: Query product row
-            candidate_product: Candidate product row
+            query_idx: Index of query product
+            alpha: Weight for content similarity (0-1)
+            k: Page size
+            offset: Offset for pagination
             
         Returns:
-            Reason string
+            Tuple of (page indices, page scores, page similarities), or None
+            if a product outside the list could rank within the page
         """
-        reasons = []
+        start = self.candidate_indptr[query_idx]
+        end = self.candidate_indptr[query_idx + 1]
+        candidate_ids = self.candidate_ids[start:end]
+        candidate_sims = self.candidate_sims[start:end]
+        
+        page_indices, page_scores = blend_top_k_subset(
+            candidate_ids,
+            candidate_sims,
+            self.popularity_arr,
+            alpha,
+            self.pid_rank,
+            k,
+            offset
+        )
         
-        if content_sim >= 0.6:
-            reasons.append("strong content match")
-        elif content_sim >= 0.3:
-            reasons.append("moderate text similarity")
+        if k > 0 and len(candidate_ids) < len(self.product_ids_arr) - 1:
+            # Best score any product outside the list could reach (an empty
+            # page for k <= 0 is exact without it)
+            bound = blend_score(
+                self.candidate_sim_floor[query_idx], self.popularity_floor, alpha
+            )
+            if len(page_indices) < k or not page_scores[-1] > bound:
+                return None
         
-        if query_product['brand'] == candidate_product['brand']:
-            reasons.append("same brand")
+        # Candidate lists are sorted, so page similarities are a binary
+        # search away
+        positions = np.searchsorted(candidate_ids, page_indices)
+        return page_indices, page_scores, candidate_sims[positions]
+    
+    def _reason_codes(
+        self,
+        page_sims: np.ndarray,
+        page_indices: np.ndarray,
+        query_idx: int
+    ) -> np.ndarray:
+        """Compute explainable reason codes for a page of recommendations.
         
-        if query_product['category'] == candidate_product['category']:
-            reasons.append("same category")
+        Args:
+            page_sims: Content similarity of each recommended product
+            page_indices: Indices of the recommended products
+            query_idx: Index of query product
+            
+        Returns:
+            uint8 array of Reason flags (see REASON_TEXT)
+        """
+        # Thresholds are compared in float64, as on the Python floats before
+        sims = page_sims.astype(np.float64)
+        popularity = self.popularity_arr[page_indices].astype(np.float64)
+        codes = np.zeros(len(page_indices), dtype=np.int64)
         
-        if popularity >= 0.7:
-            reasons.append("popular item")
-        elif popularity >= 0.4:
-            reasons.append("moderate popularity")
+        codes[sims >= 0.6] |= Reason.STRONG_CONTENT
+        codes[(sims >= 0.3) & (sims < 0.6)] |= Reason.MODERATE_TEXT
         
-        if not reasons:
-            if content_sim > 0:
-                reasons.append("low content similarity")
-            else:
-                reasons.append("popular fallback")
+        # Missing values (code -1) never count as a match
+        brand_code = self.brand_codes[query_idx]
+        if brand_code >= 0:
+            codes[self.brand_codes[page_indices] == brand_code] |= Reason.SAME_BRAND
+        
+        category_code = self.category_codes[query_idx]
+        if category_code >= 0:
+            same_category = self.category_codes[page_indices] == category_code
+            codes[same_category] |= Reason.SAME_CATEGORY
+        
+        codes[popularity >= 0.7] |= Reason.POPULAR
+        codes[(popularity >= 0.4) & (popularity < 0.7)] |= Reason.MODERATE_POPULARITY
+        
+        no_reason = codes == 0
+        codes[no_reason & (sims > 0)] = Reason.LOW_CONTENT
+        codes[no_reason & ~(sims > 0)] = Reason.POPULAR_FALLBACK
         
-        return " & ".join(reasons) if reasons else "general recommendation"
+        return codes.astype(np.uint8)
     
     def recommend_for_product(
         self,
@@ -152,7 +551,7 @@ class Recommender:
         offset: int = 0,
         diversify: bool = False,
         seed: int = 0
-    ) -> Tuple[List[Dict], int]:
+    ) -> Tuple[RecommendationBatch, int]:
         """Get recommendations for a product.
         
         Args:
@@ -161,81 +560,95 @@ class Recommender:
             alpha: Weight for content similarity (0-1)
             offset: Offset for pagination
             diversify: Whether to diversify results (not implemented)
-            seed: Random seed for tie-breaking
+            seed: Seed carried by pagination cursors (ranking is deterministic
+                and uses no random state)
             
         Returns:
-            Tuple of (recommendations list, total_available)
+            Tuple of (recommendation batch, total_available)
         """
-        if product_id not in self.product_id_to_idx:
+        # One hash lookup resolves the row; the kernels only see integers
+        query_idx = self.product_id_to_idx.get(product_id, -1)
+        if query_idx < 0:
             # Cold start: return top popular items
             return self._get_popular_fallback(k, offset, seed), len(self.catalog_df)
         
-        query_idx = self.product_id_to_idx[product_id]
-        query_product = self.catalog_df.iloc[query_idx]
+        total_available = len(self.product_ids_arr) - 1
         
-        # Get all candidate indices (exclude query product)
-        candidate_indices = [
-            i for i in range(len(self.catalog_df))
-            if i != query_idx
-        ]
-        candidate_ids = [self.idx_to_product_id[i] for i in candidate_indices]
-        
-        # Compute content similarity
-        content_sims = self._get_content_similarity(query_idx, candidate_indices)
-        
-        # Compute popularity scores
-        popularity_scores = self._get_popularity_scores(candidate_ids)
-        
-        # Combine scores
-        combined_scores = alpha * content_sims + (1 - alpha) * popularity_scores
-        
-        # Set seed for deterministic tie-breaking
-        np.random.seed(seed)
+        # Blend scores and select the requested page in one pass (score
+        # descending, ties broken by product_id rank); the query product
+        # itself is never a candidate. The precomputed candidate list is
+        # tried first and the whole catalog is scored only if it falls short
+        page = self._blend_candidates(query_idx, alpha, k, offset)
+        if page is not None:
+            paginated_indices, page_scores, page_sims = page
+        else:
+            # The similarity row does not depend on alpha, so it is cached
+            # per query product and only the blend runs per call
+            content_sims = self._similarity_row(query_idx)
+            paginated_indices, page_scores = blend_top_k(
+                content_sims,
+                self.popularity_arr,
+                alpha,
+                self.pid_rank,
+                query_idx,
+                k,
+                offset
+            )
+            page_sims = content_sims[paginated_indices]
         
-        # Sort by score (descending), with deterministic tie-breaking
-        # Use product_id as secondary sort key for determinism
-        sort_keys = [
-            (-combined_scores[i], candidate_ids[i])
-            for i in range(len(candidate_indices))
-        ]
-        sorted_indices = sorted(
-            range(len(candidate_indices)),
-            key=lambda i: sort_keys[i]
+        # Build recommendations (dicts are only created when accessed)
+        recommendations = RecommendationBatch(
+            self.product_ids_arr[paginated_indices],
+            page_scores,
+            self._reason_codes(page_sims, paginated_indices, query_idx)
         )
         
-        # Apply pagination
-        total_available = len(sorted_indices)
-        paginated_indices = sorted_indices[offset:offset + k]
+        return recommendations, total_available
+    
+    def recommend_paginated(
+        self,
+        product_id: str,
+        page_size: int = 10,
+        n_pages: int = 2,
+        alpha: float = 0.6,
+        offset: int = 0,
+        seed: int = 0
+    ) -> Tuple[List[RecommendationBatch], int]:
+        """Get several consecutive pages of recommendations at once.
         
-        # Build recommendations
-        recommendations = []
-        for idx in paginated_indices:
-            candidate_idx = candidate_indices[idx]
-            candidate_id = candidate_ids[idx]
-            candidate_product = self.catalog_df.iloc[candidate_idx]
-            
-            content_sim = float(content_sims[idx])
-            popularity = float(popularity_scores[idx])
-            score = float(combined_scores[idx])
-            
-            reason = self._generate_reason(
-                content_sim, popularity, query_product, candidate_product
-            )
-            
-            recommendations.append({
-                'product_id': candidate_id,
-                'score': round(score, 3),
-                'reason': reason
-            })
+        Scores are blended and selected once for all pages, which are then
+        sliced from the combined result.
         
-        return recommendations, total_available
+        Args:
+            product_id: Product ID to get recommendations for
+            page_size: Number of recommendations per page
+            n_pages: Number of pages
+            alpha: Weight for content similarity (0-1)
+            offset: Offset of the first page
+            seed: Seed carried by pagination cursors
+            
+        Returns:
+            Tuple of (list of n_pages recommendation batches, total_available)
+        """
+        recommendations, total_available = self.recommend_for_product(
+            product_id=product_id,
+            k=page_size * n_pages,
+            alpha=alpha,
+            offset=offset,
+            seed=seed
+        )
+        pages = [
+            recommendations[page * page_size:(page + 1) * page_size]
+            for page in range(n_pages)
+        ]
+        return pages, total_available
     
     def _get_popular_fallback(
         self, 
         k: int, 
         offset: int, 
         seed: int
-    ) -> List[Dict]:
+    ) -> RecommendationBatch:
         """Get popular items as fallback for cold start.
         
         Args:
@@ -244,45 +657,131 @@ class Recommender:
             seed: Random seed
             
         Returns:
-            List of recommendations
+            Batch of recommendations
         """
-        # Sort products by popularity
-        product_scores = [
-            (pid, self.popularity_scores.get(pid, 0.0))
-            for pid in self.catalog_df['product_id']
-        ]
-        product_scores.sort(key=lambda x: (-x[1], x[0]))  # Deterministic
+        # Slice the popularity order precomputed at fit (ties broken by
+        # product_id, deterministic)
+        paginated_indices = self.popular_order[offset:offset + k]
+        
+        return RecommendationBatch(
+            self.product_ids_arr[paginated_indices],
+            self.popularity_arr[paginated_indices],
+            np.full(len(paginated_indices), Reason.POPULAR_FALLBACK, dtype=np.uint8)
+        )
+    
+    def search(self, query: str, limit: Optional[int] = None) -> np.ndarray:
+        """Find catalog rows whose text contains the query (case-insensitive).
+        
+        Matches are cached per lowercased query and limit, so repeated
+        queries skip the scan.
+        
+        Args:
+            query: Text query to search for
+            limit: Stop after this many matching rows (None for all)
+            
+        Returns:
+            Sorted, read-only array of matching catalog row indices
+        """
+        return self._search_matches(query.lower(), limit)
+    
+    def _scan_search_blob(
+        self,
+        query_lower: str,
+        limit: Optional[int] = None
+    ) -> np.ndarray:
+        """Scan the search blob for a lowercased query.
         
-        # Apply pagination
-        paginated = product_scores[offset:offset + k]
+        Uses repeated ``str.find`` over the precomputed blob. After a hit the
+        scan jumps to the start of the next row, so each matching row costs
+        one find, and it stops early once ``limit`` rows are collected.
         
-        recommendations = []
-        for product_id, score in paginated:
-            product_row = self.catalog_df[
-                self.catalog_df['product_id'] == product_id
-            ].iloc[0]
+        Args:
+            query_lower: Lowercased text query
+            limit: Stop after this many matching rows (None for all)
             
-            recommendations.append({
-                'product_id': product_id,
-                'score': round(score, 3),
-                'reason': 'popular fallback'
-            })
+        Returns:
+            Sorted, read-only array of matching catalog row indices
+        """
+        n_rows = len(self.search_row_ends)
+        max_rows = n_rows if limit is None else min(limit, n_rows)
         
-        return recommendations
+        if not query_lower:
+            rows = np.arange(max_rows)
+        elif SEARCH_SEPARATOR in query_lower:
+            rows = np.empty(0, dtype=np.int64)
+        else:
+            blob = self.search_blob
+            row_ends = self.search_row_ends
+            matched = []
+            pos = blob.find(query_lower)
+            while pos != -1 and len(matched) < max_rows:
+                row = int(np.searchsorted(row_ends, pos, side='right'))
+                matched.append(row)
+                pos = blob.find(query_lower, row_ends[row] + 1)
+            rows = np.array(matched, dtype=np.int64)
+        
+        # Shared between callers through the cache
+        rows.flags.writeable = False
+        return rows
+    
+    @staticmethod
+    def artifact_paths(filepath: str) -> List[str]:
+        """List every file written by ``save(filepath)``.
+        
+        Args:
+            filepath: Path the model is saved to
+            
+        Returns:
+            The pickle path followed by its sidecar file paths
+        """
+        return (
+            [filepath]
+            + [f'{filepath}.vectors.{part}.npy' for part in VECTOR_PARTS]
+            + [f'{filepath}.vectors.shape.npy']
+            + [f'{filepath}.{name}.npy' for name in CANDIDATE_ARRAYS]
+            + [filepath + '.catalog.arrow']
+        )
     
     def save(self, filepath: str):
         """Save recommender to file.
         
+        The product vectors, candidate lists and catalog are written as
+        sidecar files next to ``filepath`` (``.vectors.<part>.npy``,
+        ``.<candidate array>.npy`` and ``.catalog.arrow``) so they can be
+        memory-mapped or loaded by columnar readers; the pickle
+        only holds the remaining bookkeeping state and is zstd-compressed.
+        
         Args:
             filepath: Path to save file
         """
-        with open(filepath, 'wb') as f:
-            pickle.dump(self, f)
+        vectors = self.product_vectors
+        for part in VECTOR_PARTS:
+            np.save(f'{filepath}.vectors.{part}.npy', getattr(vectors, part))
+        np.save(f'{filepath}.vectors.shape.npy', np.array(vectors.shape))
+        for name in CANDIDATE_ARRAYS:
+            np.save(f'{filepath}.{name}.npy', getattr(self, name))
+        self.catalog_df.reset_index(drop=True).to_feather(
+            filepath + '.catalog.arrow'
+        )
+        
+        state = copy.copy(self)
+        state.product_vectors = None
+        state.catalog_df = None
+        for name in CANDIDATE_ARRAYS:
+            setattr(state, name, None)
+        compressor = zstd.ZstdCompressor(level=PICKLE_ZSTD_LEVEL, threads=-1)
+        with open(filepath, 'wb') as f, compressor.stream_writer(f) as writer:
+            pickle.dump(state, writer, protocol=pickle.HIGHEST_PROTOCOL)
     
     @staticmethod
     def load(filepath: str) -> 'Recommender':
         """Load recommender from file.
         
+        The product vector and candidate-list arrays are memory-mapped
+        read-only, so pages are only read on access and are shared through
+        the OS page cache between worker processes. Both
+        zstd-compressed and plain pickles are accepted.
+        
         Args:
             filepath: Path to load file from
             
@@ -290,5 +789,23 @@ class Recommender:
             Loaded Recommender instance
         """
         with open(filepath, 'rb') as f:
-            return pickle.load(f)
-
+            if f.peek(4)[:4] == ZSTD_MAGIC:
+                with zstd.ZstdDecompressor().stream_reader(f) as reader:
+                    recommender = pickle.load(reader)
+            else:
+                recommender = pickle.load(f)
+        
+        data, indices, indptr = (
+            np.load(f'{filepath}.vectors.{part}.npy', mmap_mode='r')
+            for part in VECTOR_PARTS
+        )
+        shape = tuple(np.load(f'{filepath}.vectors.shape.npy'))
+        recommender.product_vectors = sparse.csr_matrix(
+            (data, indices, indptr), shape=shape, copy=False
+        )
+        for name in CANDIDATE_ARRAYS:
+            setattr(recommender, name, np.asarray(
+                np.load(f'{filepath}.{name}.npy', mmap_mode='r')
+            ))
+        recommender.catalog_df = pd.read_feather(filepath + '.catalog.arrow')
+        return recommender
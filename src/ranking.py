@@ -0,0 +1,182 @@
+"""Compiled top-k selection kernels for ranking recommendation scores."""
+import numpy as np
+from numba import njit
+
+
+@njit(cache=True)
+def _is_better(score_a, rank_a, score_b, rank_b):
+    """Return True if candidate a ranks ahead of candidate b."""
+    if score_a != score_b:
+        return score_a > score_b
+    return rank_a < rank_b
+
+
+@njit(cache=True)
+def _sift_down(heap_idx, heap_scores, size, pos, tie_rank):
+    """Restore the heap property below pos (worst candidate at the root)."""
+    while True:
+        worst = pos
+        left = 2 * pos + 1
+        right = left + 1
+        if left < size and _is_better(
+            heap_scores[worst], tie_rank[heap_idx[worst]],
+            heap_scores[left], tie_rank[heap_idx[left]]
+        ):
+            worst = left
+        if right < size and _is_better(
+            heap_scores[worst], tie_rank[heap_idx[worst]],
+            heap_scores[right], tie_rank[heap_idx[right]]
+        ):
+            worst = right
+        if worst == pos:
+            return
+        heap_idx[pos], heap_idx[worst] = heap_idx[worst], heap_idx[pos]
+        heap_scores[pos], heap_scores[worst] = heap_scores[worst], heap_scores[pos]
+        pos = worst
+
+
+@njit(cache=True)
+def _offer(heap_idx, heap_scores, size, i, score, tie_rank):
+    """Offer candidate i to a bounded heap and return the new heap size."""
+    if size < heap_idx.shape[0]:
+        pos = size
+        heap_idx[pos] = i
+        heap_scores[pos] = score
+        # Sift up
+        while pos > 0:
+            parent = (pos - 1) // 2
+            if _is_better(
+                heap_scores[parent], tie_rank[heap_idx[parent]],
+                heap_scores[pos], tie_rank[heap_idx[pos]]
+            ):
+                heap_idx[parent], heap_idx[pos] = heap_idx[pos], heap_idx[parent]
+                heap_scores[parent], heap_scores[pos] = (
+                    heap_scores[pos], heap_scores[parent]
+                )
+                pos = parent
+            else:
+                break
+        return size + 1
+    if _is_better(score, tie_rank[i], heap_scores[0], tie_rank[heap_idx[0]]):
+        heap_idx[0] = i
+        heap_scores[0] = score
+        _sift_down(heap_idx, heap_scores, size, 0, tie_rank)
+    return size
+
+
+@njit(cache=True)
+def _drain(heap_idx, heap_scores, size, tie_rank):
+    """Heap sort in place so the heap arrays are ordered best first."""
+    while size > 1:
+        size -= 1
+        heap_idx[0], heap_idx[size] = heap_idx[size], heap_idx[0]
+        heap_scores[0], heap_scores[size] = heap_scores[size], heap_scores[0]
+        _sift_down(heap_idx, heap_scores, size, 0, tie_rank)
+
+
+@njit(cache=True)
+def blend_score(sim, pop, alpha):
+    """Blend one similarity and popularity in float32, as blend_top_k does."""
+    a = np.float32(alpha)
+    b = np.float32(1.0 - alpha)
+    return a * np.float32(sim) + b * np.float32(pop)
+
+
+@njit(cache=True)
+def blend_top_k(sims, pop, alpha, tie_rank, exclude, k, offset):
+    """Blend similarity and popularity and select one page in a single pass.
+    
+    Each candidate's score alpha * sim + (1 - alpha) * pop is computed in
+    float32 and offered straight to the bounded heap, so the full score
+    array is never materialized. Only exactly equal float32 scores are
+    ordered by tie_rank; scores that differ in the last bit keep their
+    float order even if they round to the same reported value.
+    
+    Args:
+        sims: float32 array of content similarities
+        pop: float32 array of popularity scores
+        alpha: Weight for content similarity (0-1)
+        tie_rank: int32 array of tie-break ranks (lower ranks first)
+        exclude: Index to skip (the query product), or -1
+        k: Page size
+        offset: Number of leading candidates to skip
+    
+    Returns:
+        Tuple of (int64 page indices, float32 page scores), best first
+    """
+    n = sims.shape[0]
+    n_candidates = n - 1 if 0 <= exclude < n else n
+    size_limit = min(offset + k, n_candidates)
+    if size_limit <= offset:
+        return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float32)
+    
+    heap_idx = np.empty(size_limit, dtype=np.int64)
+    heap_scores = np.empty(size_limit, dtype=np.float32)
+    size = 0
+    for i in range(n):
+        if i == exclude:
+            continue
+        score = blend_score(sims[i], pop[i], alpha)
+        size = _offer(heap_idx, heap_scores, size, i, score, tie_rank)
+    _drain(heap_idx, heap_scores, size, tie_rank)
+    
+    return heap_idx[offset:size_limit], heap_scores[offset:size_limit]
+
+
+@njit(cache=True)
+def blend_top_k_subset(candidates, sims, pop, alpha, tie_rank, k, offset):
+    """Blend and select one page among a subset of candidates in one pass.
+    
+    Like blend_top_k, but only the given candidates are scored, reading
+    their popularity and tie-break ranks straight from the full arrays
+    instead of from gathered copies.
+    
+    Args:
+        candidates: int32 array of candidate indices
+        sims: float32 content similarities aligned with candidates
+        pop: float32 popularity scores for every product
+        alpha: Weight for content similarity (0-1)
+        tie_rank: int32 tie-break ranks for every product (lower first)
+        k: Page size
+        offset: Number of leading candidates to skip
+    
+    Returns:
+        Tuple of (int64 page product indices, float32 page scores), best
+        first
+    """
+    n = candidates.shape[0]
+    size_limit = min(offset + k, n)
+    if size_limit <= offset:
+        return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float32)
+    
+    heap_idx = np.empty(size_limit, dtype=np.int64)
+    heap_scores = np.empty(size_limit, dtype=np.float32)
+    size = 0
+    for j in range(n):
+        i = candidates[j]
+        score = blend_score(sims[j], pop[i], alpha)
+        size = _offer(heap_idx, heap_scores, size, i, score, tie_rank)
+    _drain(heap_idx, heap_scores, size, tie_rank)
+    
+    return heap_idx[offset:size_limit], heap_scores[offset:size_limit]
+
+
+def warm_up():
+    """Compile the ranking kernels ahead of the first request.
+    
+    The kernels are compiled for the argument types the model passes: cached
+    similarity rows and memory-mapped candidate lists are read-only arrays,
+    freshly fitted ones are writable, and the candidate-list bound blends a
+    float32 similarity floor with a float64 popularity floor.
+    """
+    scores = np.zeros(2, dtype=np.float32)
+    tie_rank = np.zeros(2, dtype=np.int32)
+    frozen_scores = scores.copy()
+    frozen_scores.flags.writeable = False
+    frozen_ids = tie_rank.copy()
+    frozen_ids.flags.writeable = False
+    
+    for sims, candidates in ((scores, tie_rank), (frozen_scores, frozen_ids)):
+        blend_top_k(sims, scores, 0.5, tie_rank, 0, 1, 0)
+        blend_top_k_subset(candidates, sims, scores, 0.5, tie_rank, 1, 0)
+    blend_score(np.float32(0.0), 0.0, 0.5)
@@ -1,9 +1,16 @@
-"""Utility functions for cursor encoding/decoding and seed management."""
+"""Utility functions for cursor encoding/decoding."""
 import base64
-import os
+import struct
 
-# Set deterministic hash seed
-os.environ['PYTHONHASHSEED'] = '0'
+
+# Cursor layout: version byte, little-endian uint32 offset and seed, then
+# the UTF-8 product_id. Cursors issued before the binary header are the
+# text "product_id|offset|seed" and are still accepted.
+CURSOR_VERSION = 1
+_CURSOR_HEADER = struct.Struct('<BII')
+
+# Largest offset or seed a cursor can carry (uint32 fields)
+CURSOR_MAX_VALUE = 2 ** 32 - 1
 
 
 def encode_cursor(product_id: str, offset: int, seed: int) -> str:
@@ -16,14 +23,25 @@ def encode_cursor(product_id: str, offset: int, seed: int) -> str:
         
     Returns:
         Base64-encoded cursor string
+        
+    Raises:
+        ValueError: If offset or seed is outside 0..CURSOR_MAX_VALUE
     """
-    cursor_str = f"{product_id}|{offset}|{seed}"
-    return base64.urlsafe_b64encode(cursor_str.encode()).decode()
+    if not (0 <= offset <= CURSOR_MAX_VALUE and 0 <= seed <= CURSOR_MAX_VALUE):
+        raise ValueError(
+            "Cursor offset and seed must fit in an unsigned 32-bit integer"
+        )
+    raw = _CURSOR_HEADER.pack(CURSOR_VERSION, offset, seed) + product_id.encode()
+    return base64.urlsafe_b64encode(raw).decode()
 
 
 def decode_cursor(cursor: str) -> tuple[str, int, int]:
     """Decode cursor from URL-safe base64 string.
     
+    Both the binary format and the legacy "product_id|offset|seed" text
+    format are accepted. Legacy offsets and seeds are not range-checked
+    here, so callers re-encoding them should check CURSOR_MAX_VALUE.
+    
     Args:
         cursor: Base64-encoded cursor string
         
@@ -31,11 +49,16 @@ def decode_cursor(cursor: str) -> tuple[str, int, int]:
         Tuple of (product_id, offset, seed)
     """
     try:
-        decoded = base64.urlsafe_b64decode(cursor.encode()).decode()
-        parts = decoded.split('|')
-        if len(parts) != 3:
+        raw = base64.urlsafe_b64decode(cursor.encode())
+        if raw[:1] == bytes([CURSOR_VERSION]):
+            _, offset, seed = _CURSOR_HEADER.unpack_from(raw)
+            return raw[_CURSOR_HEADER.size:].decode(), offset, seed
+        
+        # Legacy text cursor
+        product_id, offset, seed = raw.decode().split('|')
+        offset, seed = int(offset), int(seed)
+        if offset < 0 or seed < 0:
             raise ValueError("Invalid cursor format")
-        return parts[0], int(parts[1]), int(parts[2])
+        return product_id, offset, seed
     except Exception:
         raise ValueError("Invalid cursor format")
-
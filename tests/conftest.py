@@ -0,0 +1,20 @@
+"""Shared pytest fixtures."""
+import numpy as np
+import pytest
+from src.model import Recommender
+
+
+@pytest.fixture
+def rng():
+    """Fresh, explicitly seeded random generator for each test."""
+    return np.random.default_rng(0)
+
+
+@pytest.fixture(scope="session")
+def recommender():
+    """Load the model once per test process (tests only read it).
+    
+    Its numeric arrays are memory-mapped, so xdist workers share one copy
+    of them through the OS page cache.
+    """
+    return Recommender.load('models/recommender.pkl')
@@ -1,12 +1,9 @@
 """Tests for FastAPI endpoints."""
-import os
 import pytest
+from fastapi.routing import APIRoute
 from fastapi.testclient import TestClient
 from src.app import app
 
-# Set deterministic hash seed
-os.environ['PYTHONHASHSEED'] = '0'
-
 client = TestClient(app)
 
 
@@ -70,6 +67,21 @@ def test_recommend_with_cursor():
             assert data1["items"][0]["product_id"] != data2["items"][0]["product_id"]
 
 
+def test_recommend_with_legacy_cursor():
+    """Test that text-format cursors still paginate and oversized offsets give 400."""
+    # base64 of "prod_1|5|0"
+    response = client.get("/recommend?product_id=prod_1&k=5&cursor=cHJvZF8xfDV8MA==")
+    assert response.status_code == 200
+    assert response.json()["offset"] == 5
+    
+    # base64 of "prod_1|4294967295|0"
+    response = client.get(
+        "/recommend?product_id=prod_1&k=5&cursor=cHJvZF8xfDQyOTQ5NjcyOTV8MA=="
+    )
+    assert response.status_code == 400
+    assert response.json()["detail"] == "Cursor offset out of range"
+
+
 def test_health_endpoint():
     """Test health check endpoint."""
     response = client.get("/health")
@@ -77,3 +89,24 @@ def test_health_endpoint():
     data = response.json()
     assert data["status"] == "healthy"
 
+
+def test_search():
+    """Test text search over the catalog."""
+    response = client.get("/search?query=Headphones&k=3")
+    assert response.status_code == 200
+    data = response.json()
+    
+    assert data["query"] == "Headphones"
+    assert data["total_results"] >= len(data["items"])
+    assert 0 < len(data["items"]) <= 3
+    for item in data["items"]:
+        assert "product_id" in item
+        assert "product_name" in item
+
+
+def test_routes_registered_once():
+    """Test that every endpoint is registered exactly once."""
+    paths = [route.path for route in app.routes if isinstance(route, APIRoute)]
+    assert sorted(paths) == [
+        "/health", "/recommend", "/search", "/search-and-recommend"
+    ]
@@ -1,18 +1,14 @@
 """Tests for deterministic model outputs."""
-import os
+import copy
+from itertools import chain
 import numpy as np
-from src.model import Recommender
+import pytest
+from src import model as model_module
+from src.model import REASON_TEXT, Reason, Recommender
 
-# Set deterministic seeds
-os.environ['PYTHONHASHSEED'] = '0'
-np.random.seed(0)
 
-
-def test_deterministic_recommendations():
+def test_deterministic_recommendations(recommender):
     """Test that recommendations are deterministic."""
-    # Load model
-    recommender = Recommender.load('models/recommender.pkl')
-    
     # Get recommendations with specific parameters
     recommendations1, total1 = recommender.recommend_for_product(
         product_id='prod_1',
@@ -36,22 +32,18 @@ def test_deterministic_recommendations():
     assert len(recommendations1) == len(recommendations2)
     assert len(recommendations1) == 3
     
-    for i in range(len(recommendations1)):
-        assert recommendations1[i]['product_id'] == recommendations2[i]['product_id']
-        assert recommendations1[i]['score'] == recommendations2[i]['score']
-        assert recommendations1[i]['reason'] == recommendations2[i]['reason']
+    assert np.array_equal(recommendations1.product_ids, recommendations2.product_ids)
+    assert np.array_equal(recommendations1.scores, recommendations2.scores)
+    assert recommendations1.reasons == recommendations2.reasons
     
     # Check scores are in valid range
-    for rec in recommendations1:
-        assert 0 <= rec['score'] <= 1
-        assert isinstance(rec['reason'], str)
-        assert len(rec['reason']) > 0
+    scores = np.round(recommendations1.scores, 3)
+    assert np.all((scores >= 0) & (scores <= 1))
+    assert all(isinstance(reason, str) and reason for reason in recommendations1.reasons)
 
 
-def test_different_alpha_values():
+def test_different_alpha_values(recommender):
     """Test that different alpha values produce different results."""
-    recommender = Recommender.load('models/recommender.pkl')
-    
     # High alpha (content-focused)
     recs_high, _ = recommender.recommend_for_product(
         product_id='prod_1',
@@ -76,29 +68,18 @@ def test_different_alpha_values():
     assert len(recs_low) == 3
     
     # Scores should be valid
-    for rec in recs_high + recs_low:
-        assert 0 <= rec['score'] <= 1
+    scores = np.round(np.concatenate([recs_high.scores, recs_low.scores]), 3)
+    assert np.all((scores >= 0) & (scores <= 1))
 
 
-def test_pagination():
+def test_pagination(recommender):
     """Test that pagination works correctly."""
-    recommender = Recommender.load('models/recommender.pkl')
-    
-    # First page
-    recs_page1, total = recommender.recommend_for_product(
-        product_id='prod_1',
-        k=5,
-        alpha=0.6,
-        offset=0,
-        seed=0
-    )
-    
-    # Second page
-    recs_page2, _ = recommender.recommend_for_product(
+    # First two pages from a single selection
+    (recs_page1, recs_page2), total = recommender.recommend_paginated(
         product_id='prod_1',
-        k=5,
+        page_size=5,
+        n_pages=2,
         alpha=0.6,
-        offset=5,
         seed=0
     )
     
@@ -107,16 +88,15 @@ def test_pagination():
         assert recs_page1[0]['product_id'] != recs_page2[0]['product_id']
     
     # All should be valid
-    for rec in recs_page1 + recs_page2:
-        assert 0 <= rec['score'] <= 1
+    scores = np.round(np.concatenate([recs_page1.scores, recs_page2.scores]), 3)
+    assert np.all((scores >= 0) & (scores <= 1))
+    for rec in chain(recs_page1, recs_page2):
         assert 'product_id' in rec
         assert 'reason' in rec
 
 
-def test_cold_start():
+def test_cold_start(recommender):
     """Test cold start handling for unknown product."""
-    recommender = Recommender.load('models/recommender.pkl')
-    
     # Try with unknown product (should use popular fallback)
     recs, total = recommender.recommend_for_product(
         product_id='unknown_product_xyz',
@@ -131,7 +111,138 @@ def test_cold_start():
     assert len(recs) <= 5
     
     # All should have "popular fallback" reason or valid reasons
-    for rec in recs:
-        assert 0 <= rec['score'] <= 1
-        assert 'reason' in rec
+    scores = np.round(recs.scores, 3)
+    assert np.all((scores >= 0) & (scores <= 1))
+    assert all(recs.reasons)
+
+
+def test_candidate_lists_match_full_scan(recommender):
+    """Test that candidate lists give exactly the pages of a full scan."""
+    full_scan = copy.copy(recommender)
+    full_scan._blend_candidates = lambda *args: None
+    
+    # Very short lists force both the candidate path and the full-scan
+    # fallback; the shipped lists are checked as well
+    pruned = copy.copy(recommender)
+    pruned._build_candidate_lists(n_neighbors=3, n_popular=3)
+    
+    for model in (recommender, pruned):
+        for product_id in ['prod_1', 'prod_7', 'prod_20']:
+            for alpha in (0.0, 0.6, 1.0):
+                for offset, k in ((0, 3), (5, 5), (0, 10)):
+                    expected, expected_total = full_scan.recommend_for_product(
+                        product_id, k=k, alpha=alpha, offset=offset
+                    )
+                    actual, total = model.recommend_for_product(
+                        product_id, k=k, alpha=alpha, offset=offset
+                    )
+                    assert np.array_equal(actual.product_ids, expected.product_ids)
+                    assert np.array_equal(actual.scores, expected.scores)
+                    assert np.array_equal(actual.reason_codes, expected.reason_codes)
+                    assert total == expected_total
+
+
+def test_candidate_lists_independent_of_block_size(recommender, monkeypatch):
+    """Test that building candidate lists in small blocks gives the same lists."""
+    monkeypatch.setattr(model_module, 'CANDIDATE_BLOCK_BYTES', 1)
+    blocked = copy.copy(recommender)
+    blocked._build_candidate_lists()
+    
+    np.testing.assert_array_equal(blocked.candidate_indptr, recommender.candidate_indptr)
+    np.testing.assert_array_equal(blocked.candidate_ids, recommender.candidate_ids)
+    np.testing.assert_array_equal(blocked.candidate_sims, recommender.candidate_sims)
+    np.testing.assert_array_equal(
+        blocked.candidate_sim_floor, recommender.candidate_sim_floor
+    )
+
 
+def test_similarity_cache_bounded_by_bytes(recommender, monkeypatch):
+    """Test that the similarity cache holds at most its byte budget."""
+    row_bytes = 4 * len(recommender.product_ids_arr)
+    monkeypatch.setattr(model_module, 'SIMILARITY_CACHE_BYTES', 3 * row_bytes)
+    bounded = copy.copy(recommender)
+    bounded._reset_caches()
+    
+    for product_id in ['prod_1', 'prod_2', 'prod_3', 'prod_4', 'prod_5']:
+        bounded._similarity_row(bounded.product_id_to_idx[product_id])
+    
+    assert bounded._similarity_row.cache_info().currsize == 3
+
+
+def test_search_cache_bounded_by_bytes(recommender, monkeypatch):
+    """Test that the search cache holds at most its byte budget."""
+    entry_bytes = 8 * len(recommender.product_ids_arr)
+    monkeypatch.setattr(model_module, 'SEARCH_CACHE_BYTES', 2 * entry_bytes)
+    bounded = copy.copy(recommender)
+    bounded._reset_caches()
+    
+    for query in ['a', 'e', 'o', '']:
+        bounded.search(query)
+    
+    assert bounded._search_matches.cache_info().currsize == 2
+
+def test_recommendation_batch_access(recommender):
+    """Test that batch items, slices and to_dicts agree."""
+    recs, _ = recommender.recommend_for_product(product_id='prod_1', k=4)
+    
+    assert [dict(rec) for rec in recs] == recs.to_dicts()
+    assert recs[1:3].to_dicts() == recs.to_dicts()[1:3]
+    with pytest.raises(TypeError):
+        recs[0]['score'] = 0.0
+
+
+def test_recommendation_batch_list_compat(recommender):
+    """Test that batches compare and concatenate like lists of dicts."""
+    (page1, page2), _ = recommender.recommend_paginated('prod_1', page_size=3, n_pages=2)
+    
+    assert page1 == page1.to_dicts()
+    assert page1 != page2
+    assert page1 + page2 == page1.to_dicts() + page2.to_dicts()
+    assert page1 + page2.to_dicts() == page1.to_dicts() + page2.to_dicts()
+    assert page1.to_dicts() + page2 == page1.to_dicts() + page2.to_dicts()
+
+
+def test_reason_codes_map_to_joined_phrases():
+    """Test that reason codes decode to the joined reason phrases."""
+    assert REASON_TEXT[Reason.SAME_BRAND | Reason.POPULAR] == "same brand & popular item"
+    assert REASON_TEXT[Reason.POPULAR_FALLBACK] == "popular fallback"
+    assert REASON_TEXT[0] == "general recommendation"
+
+
+def test_recommend_paginated_matches_single_pages(recommender):
+    """Test that batched pages equal pages requested one at a time."""
+    pages, total = recommender.recommend_paginated('prod_3', page_size=4, n_pages=3)
+    
+    for page_number, page in enumerate(pages):
+        expected, expected_total = recommender.recommend_for_product(
+            'prod_3', k=4, offset=page_number * 4
+        )
+        assert page.to_dicts() == expected.to_dicts()
+        assert total == expected_total
+
+
+def test_empty_pages(recommender):
+    """Test that zero-sized requests return empty pages."""
+    recs, total = recommender.recommend_for_product('prod_1', k=0)
+    assert len(recs) == 0
+    assert total == len(recommender.product_ids_arr) - 1
+    
+    pages, _ = recommender.recommend_paginated('prod_1', page_size=0, n_pages=2)
+    assert [len(page) for page in pages] == [0, 0]
+    
+    pages, total = recommender.recommend_paginated('prod_1', n_pages=0)
+    assert pages == []
+    assert total == len(recommender.product_ids_arr) - 1
+
+def test_save_writes_listed_artifacts(recommender, tmp_path):
+    """Test that save writes exactly the artifact files and loads back."""
+    filepath = str(tmp_path / 'model.pkl')
+    recommender.save(filepath)
+    
+    assert sorted(str(path) for path in tmp_path.iterdir()) == sorted(
+        Recommender.artifact_paths(filepath)
+    )
+    loaded = Recommender.load(filepath)
+    assert loaded.recommend_for_product('prod_1', k=5) == (
+        recommender.recommend_for_product('prod_1', k=5)
+    )
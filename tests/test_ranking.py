@@ -0,0 +1,64 @@
+"""Tests for the compiled top-k ranking kernel."""
+import subprocess
+import sys
+import textwrap
+import numpy as np
+from src.ranking import blend_top_k, blend_top_k_subset
+
+
+def test_blend_top_k_matches_numpy_blend(rng):
+    """Test that the fused blend + top-k matches blending then sorting."""
+    sims = rng.random(30).astype(np.float32)
+    pop = (rng.integers(0, 4, size=30) / 3).astype(np.float32)
+    tie_rank = rng.permutation(30).astype(np.int32)
+    
+    combined = 0.6 * sims + 0.4 * pop
+    expected = [i for i in np.lexsort((tie_rank, -combined)) if i != 7]
+    
+    indices, scores = blend_top_k(sims, pop, 0.6, tie_rank, 7, 29, 0)
+    assert list(indices) == expected
+    assert np.array_equal(scores, combined[indices])
+
+
+def test_blend_top_k_subset_matches_gathered_blend(rng):
+    """Test that scoring a candidate subset matches blending gathered arrays."""
+    sims = rng.random(30).astype(np.float32)
+    pop = (rng.integers(0, 4, size=30) / 3).astype(np.float32)
+    tie_rank = rng.permutation(30).astype(np.int32)
+    candidates = np.sort(rng.choice(30, size=12, replace=False)).astype(np.int32)
+    
+    positions, expected_scores = blend_top_k(
+        sims[candidates], pop[candidates], 0.6, tie_rank[candidates], -1, 4, 2
+    )
+    indices, scores = blend_top_k_subset(
+        candidates, sims[candidates], pop, 0.6, tie_rank, 4, 2
+    )
+    assert list(indices) == list(candidates[positions])
+    assert np.array_equal(scores, expected_scores)
+
+
+def test_warm_up_covers_model_calls():
+    """Test that requests after warm_up compile no new kernel signatures."""
+    # A fresh interpreter, so kernels compiled by other tests do not count
+    script = textwrap.dedent("""
+        from src import ranking
+        from src.model import Recommender
+        
+        recommender = Recommender.load('models/recommender.pkl')
+        ranking.warm_up()
+        kernels = [ranking.blend_top_k, ranking.blend_top_k_subset, ranking.blend_score]
+        before = [len(kernel.signatures) for kernel in kernels]
+        
+        n_products = len(recommender.product_ids_arr)
+        recommender.recommend_for_product('prod_1', k=10, alpha=0.6)
+        recommender.recommend_for_product('prod_1', k=n_products, alpha=0.6)
+        recommender.recommend_for_product('unknown_product_xyz', k=5)
+        
+        assert [len(kernel.signatures) for kernel in kernels] == before, (
+            [kernel.signatures for kernel in kernels]
+        )
+    """)
+    result = subprocess.run(
+        [sys.executable, '-c', script], capture_output=True, text=True
+    )
+    assert result.returncode == 0, result.stderr
@@ -0,0 +1,28 @@
+"""Tests for cursor encoding/decoding."""
+import pytest
+from src.utils import CURSOR_MAX_VALUE, encode_cursor, decode_cursor
+
+
+def test_cursor_round_trip():
+    """Test that a cursor decodes back to its fields."""
+    cursor = encode_cursor('prod_1', 10, 7)
+    assert decode_cursor(cursor) == ('prod_1', 10, 7)
+
+
+def test_invalid_cursor():
+    """Test that malformed cursors are rejected."""
+    for cursor in ['', 'not-base64!', 'cHJvZF8xfDA=', 'cHJvZF8xfC0xfDA=']:
+        with pytest.raises(ValueError):
+            decode_cursor(cursor)
+
+
+def test_legacy_text_cursor():
+    """Test that cursors in the old "product_id|offset|seed" format decode."""
+    # base64 of "prod_1|10|7"
+    assert decode_cursor('cHJvZF8xfDEwfDc=') == ('prod_1', 10, 7)
+
+
+def test_cursor_out_of_range():
+    """Test that offsets beyond the uint32 field are rejected clearly."""
+    with pytest.raises(ValueError, match="32-bit"):
+        encode_cursor('prod_1', CURSOR_MAX_VALUE + 1, 0)
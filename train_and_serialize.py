@@ -1,20 +1,97 @@
-"""Train and serialize the recommender model."""
+"""Train and serialize the recommender model.
+
+Training is skipped when the saved model was built from the current data
+and training code (pass --force to retrain anyway).
+"""
+import hashlib
 import os
-import numpy as np
+import sys
 import pandas as pd
+import pyarrow as pa
+import pyarrow.csv as pacsv
 from src.model import Recommender
+from src.ranking import warm_up
+
+# Known CSV schemas, so PyArrow's multithreaded reader skips type inference
+CATALOG_COLUMN_TYPES = {
+    'product_id': pa.string(),
+    'product_name': pa.string(),
+    'brand': pa.string(),
+    'category': pa.string(),
+    'description': pa.string(),
+    'price': pa.float64(),
+    'created_at': pa.string(),
+}
+INTERACTION_COLUMN_TYPES = {
+    'user_id': pa.string(),
+    'product_id': pa.string(),
+    'event': pa.string(),
+    'timestamp': pa.timestamp('s'),
+}
+
+MODEL_PATH = 'models/recommender.pkl'
+
+# Files whose contents determine the trained model; their SHA-256 is stored
+# next to the model
+TRAINING_INPUTS = [
+    'data/sample_catalog.csv',
+    'data/sample_interactions.csv',
+    'src/features.py',
+    'src/model.py',
+    'train_and_serialize.py',
+]
+FINGERPRINT_PATH = MODEL_PATH + '.sha256'
+
 
-# Set deterministic seeds
-os.environ['PYTHONHASHSEED'] = '0'
-np.random.seed(0)
+def training_fingerprint() -> str:
+    """Return the SHA-256 hex digest of all training inputs."""
+    digest = hashlib.sha256()
+    for path in TRAINING_INPUTS:
+        with open(path, 'rb') as f:
+            for chunk in iter(lambda: f.read(1 << 20), b''):
+                digest.update(chunk)
+    return digest.hexdigest()
+
+
+# Compile the ranking kernels into Numba's on-disk cache so the service and
+# tests load them instead of paying the JIT cost (also when training is
+# skipped, since the cache may be missing or stale)
+print("Compiling ranking kernels...")
+warm_up()
+
+# Skip training if the model was built from identical inputs (content hash
+# rather than mtimes, which checkouts and clock skew make unreliable) and
+# every model file is present
+fingerprint = training_fingerprint()
+if '--force' not in sys.argv and all(
+    os.path.exists(path) for path in Recommender.artifact_paths(MODEL_PATH)
+):
+    try:
+        with open(FINGERPRINT_PATH) as f:
+            up_to_date = f.read().strip() == fingerprint
+    except FileNotFoundError:
+        up_to_date = False
+    if up_to_date:
+        print(f"Model up to date, skipping training ({MODEL_PATH})")
+        sys.exit(0)
 
 # Create models directory if it doesn't exist
 os.makedirs('models', exist_ok=True)
 
 # Load data
 print("Loading data...")
-catalog_df = pd.read_csv('data/sample_catalog.csv')
-interactions_df = pd.read_csv('data/sample_interactions.csv')
+catalog_df = pacsv.read_csv(
+    'data/sample_catalog.csv',
+    convert_options=pacsv.ConvertOptions(column_types=CATALOG_COLUMN_TYPES)
+).to_pandas()
+interactions_df = pacsv.read_csv(
+    'data/sample_interactions.csv',
+    convert_options=pacsv.ConvertOptions(column_types=INTERACTION_COLUMN_TYPES)
+).to_pandas()
+
+# ID columns repeat heavily; categoricals shrink them and speed up counting
+interactions_df['user_id'] = interactions_df['user_id'].astype('category')
+interactions_df['product_id'] = interactions_df['product_id'].astype('category')
 
 print(f"Loaded {len(catalog_df)} products and {len(interactions_df)} interactions")
 
@@ -25,7 +102,9 @@ recommender.fit(catalog_df, interactions_df)
 
 # Save model
 print("Saving model...")
-recommender.save('models/recommender.pkl')
+recommender.save(MODEL_PATH)
+with open(FINGERPRINT_PATH, 'w') as f:
+    f.write(fingerprint + '\n')
 
-print("Model training complete! Saved to models/recommender.pkl")
+print(f"Model training complete! Saved to {MODEL_PATH}")
 